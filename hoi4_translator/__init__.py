@@ -0,0 +1,37 @@
+"""HOI4 Mod终极汉化工具 - 可导入的流水线接口
+
+requests / tqdm 只在实际联网或显示进度时才导入，估算与校验可以立即启动。
+"""
+from .pipeline import (
+    discover_files, estimate, index_vanilla, resolve_localisation_dir, retranslate,
+    translate, translate_workspace, validate
+)
+from .progress import TranslationProgress
+from .ratelimit import RateLimiter
+from .translator import HOI4UltimateTranslator, QuotaExhausted, resolve_api_base
+from .validator import check_loc_value, validate_directories, validate_directory, validate_loc_file
+from .vanilla import VanillaIndex, build_vanilla_index
+
+__version__ = "4.0.0"
+
+__all__ = [
+    "HOI4UltimateTranslator",
+    "QuotaExhausted",
+    "RateLimiter",
+    "TranslationProgress",
+    "VanillaIndex",
+    "build_vanilla_index",
+    "check_loc_value",
+    "discover_files",
+    "estimate",
+    "index_vanilla",
+    "resolve_api_base",
+    "resolve_localisation_dir",
+    "retranslate",
+    "translate",
+    "translate_workspace",
+    "validate",
+    "validate_directories",
+    "validate_directory",
+    "validate_loc_file",
+]
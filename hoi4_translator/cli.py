@@ -0,0 +1,137 @@
+"""命令行入口：hoi4-translate / python -m hoi4_translator"""
+import argparse
+import os
+import sys
+
+from .pipeline import resolve_localisation_dir
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="hoi4-translate",
+        description="HOI4 Mod终极汉化工具 v4.0 - 专业钢铁雄心4版"
+    )
+    parser.add_argument("paths", nargs="*", help="mod的localisation目录或mod根目录（可多个）")
+    parser.add_argument("--api-key", default=os.environ.get("DEEPL_API_KEY"),
+                        help="DeepL API密钥（默认读取环境变量 DEEPL_API_KEY）")
+    parser.add_argument("--backend", default=None,
+                        help="free / pro / 自定义API根地址（如本地模拟服务），默认按密钥判断")
+    parser.add_argument("--workers", type=int, default=4, help="并发线程数 (默认: 4)")
+    parser.add_argument("--char-budget", type=int, default=None,
+                        help="本次运行最多消耗的字符数（默认只受DeepL剩余额度限制）")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="所有线程合计的每秒最大请求数（默认不限速）")
+    parser.add_argument("--workspace", metavar="STATE_DIR", default=None,
+                        help="工作区模式：所有mod统一调度、共享缓存，状态文件保存在 STATE_DIR")
+    parser.add_argument("--vanilla-index", metavar="INDEX", default=None,
+                        help="原版译文索引文件，命中官方译文的条目不再调用DeepL")
+    parser.add_argument("--no-server-glossary", action="store_true",
+                        help="不使用DeepL服务端术语表，改用本地术语替换")
+    parser.add_argument("--no-fuzzy-review", action="store_true",
+                        help="不收集翻译记忆的模糊匹配候选")
+
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--estimate", action="store_true", help="只离线估算条目数和计费字符")
+    mode.add_argument("--validate", action="store_true", help="只校验输出文件")
+    mode.add_argument("--retranslate", metavar="FAILED_KEYS",
+                      help="只重译校验生成的 failed_keys.json 中的条目")
+    mode.add_argument("--build-vanilla-index", metavar="GAME_DIR",
+                      help="读取原版游戏目录的英文和简体中文本地化，生成 --vanilla-index 索引文件")
+
+    parser.add_argument("--no-validate", action="store_true", help="翻译完成后不自动校验")
+    parser.add_argument("--validate-workers", type=int, default=None,
+                        help="校验进程数（默认: CPU核心数）")
+    return parser
+
+
+def _translator_options(args):
+    return {
+        "api_base": args.backend,
+        "max_workers": args.workers,
+        "char_budget": args.char_budget,
+        "requests_per_second": args.rate_limit,
+        "use_server_glossary": not args.no_server_glossary,
+        "fuzzy_review": not args.no_fuzzy_review,
+        "vanilla_index": args.vanilla_index
+    }
+
+
+def _run_estimate(paths, vanilla_index=None):
+    from .pipeline import estimate
+
+    grand_entries = grand_chars = 0
+    for path in paths:
+        result = estimate(path, vanilla_index=vanilla_index)
+        print(f"{path}")
+        for file_path, (entries, chars) in result["files"].items():
+            print(f"  {os.path.relpath(file_path, path)}: {entries} 条, {chars} 字符")
+        print(f"  小计: {result['total_entries']} 条, {result['total_chars']} 字符")
+        grand_entries += result["total_entries"]
+        grand_chars += result["total_chars"]
+    print(f"合计: {grand_entries} 条, 预计计费 {grand_chars} 字符")
+    return 0
+
+
+def _run_validate(paths, workers, output_dir=None):
+    from .pipeline import validate
+
+    # 所有目录一次校验，合并结果，避免后一个目录覆盖前一个的清单
+    issues, _ = validate(paths, max_workers=workers, output_dir=output_dir)
+    return 1 if issues else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.build_vanilla_index:
+        from .pipeline import index_vanilla
+
+        index_path = args.vanilla_index or "vanilla_index.bin"
+        key_count, source_count = index_vanilla(args.build_vanilla_index, index_path)
+        print(f"原版索引已生成: {index_path} ({key_count} 个键, {source_count} 条原文)")
+        return 0
+    if not args.paths and not args.retranslate:
+        parser.error("请至少指定一个localisation目录")
+    args.paths = [resolve_localisation_dir(path) for path in args.paths]
+
+    for path in args.paths:
+        if not os.path.isdir(path):
+            print(f"路径错误: {path} 不存在或不是目录", file=sys.stderr)
+            return 2
+
+    # 离线模式不加载网络与界面库
+    if args.estimate:
+        return _run_estimate(args.paths, args.vanilla_index)
+    if args.validate:
+        return _run_validate(args.paths, args.validate_workers, args.workspace)
+
+    if not args.api_key:
+        print("配置错误: 请通过 --api-key 或环境变量 DEEPL_API_KEY 提供DeepL API密钥", file=sys.stderr)
+        return 2
+
+    from .pipeline import retranslate, translate, translate_workspace
+
+    if args.retranslate:
+        translator = retranslate(args.retranslate, args.api_key, state_dir=args.workspace,
+                                 **_translator_options(args))
+        return 1 if translator.error_count else 0
+
+    print("=" * 70)
+    print("HOI4 Mod终极汉化工具 v4.0 - 专业钢铁雄心4版")
+    print("=" * 70)
+
+    if args.workspace:
+        translator = translate_workspace(args.paths, args.api_key, state_dir=args.workspace,
+                                         **_translator_options(args))
+        if not args.no_validate:
+            _run_validate(args.paths, args.validate_workers, args.workspace)
+        return 1 if translator.error_count else 0
+
+    exit_code = 0
+    for path in args.paths:
+        translator = translate(path, args.api_key, **_translator_options(args))
+        if translator.error_count:
+            exit_code = 1
+    if not args.no_validate:
+        _run_validate(args.paths, args.validate_workers)
+    return exit_code
@@ -0,0 +1,127 @@
+"""翻译记忆：数字和国家代码归一为模板槽位复用精确命中，MinHash索引提供模糊候选供人工审校"""
+import hashlib
+import random
+import re
+import threading
+
+
+class TranslationMemory:
+    """在共享翻译缓存之上提供模板归一化和模糊检索
+
+    "Gain 10% stability" 与 "Gain 15% stability" 归一为同一模板
+    "Gain __N0__% stability"，"HUN gains 10 factories" 与 "ROM gains 10 factories"
+    归一为 "__T0__ gains __N0__ factories"，只需翻译一次，命中后按槽位回填。
+    槽位按字符计费，因此尽量短：1-2位数字只多出4-5个字符。
+    """
+    TOKEN_REGEX = re.compile(
+        r'(?P<tag>__PROTECTED_[A-Z]{3}__|(?<![A-Za-z0-9_])[A-Z]{3}(?![A-Za-z0-9_]))'  # 国家代码
+        r'|(?P<keep>__(?:HOI4_VAR_\d+|[NT]\d+|PROTECTED_.+?|GLOSSARY_.+?)__)'          # 已有占位符原样保留
+        r'|(?P<number>(?<![A-Za-z_\d])\d+(?:[.,]\d+)*)'                                  # 数字
+    )
+    SLOT_TEMPLATES = {"number": "__N{}__", "tag": "__T{}__"}
+
+    def __init__(self, entries, ngram=3, num_perm=32, bands=8, threshold=0.5, seed=1936):
+        self.entries = entries            # 与翻译缓存共用同一个字典：缓存键 -> 译文模板
+        self.ngram = ngram
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._buckets = {}
+        self._indexer = None
+        self._lock = threading.Lock()
+
+    def to_template(self, text):
+        """把数字和国家代码替换为槽位，返回 (模板, [(槽位, 原值)])
+
+        全大写的文本（标题等）不替换国家代码，以免把普通单词当成代码。
+        """
+        slots = []
+        counts = {"number": 0, "tag": 0}
+        tags_allowed = any(c.islower() for c in text)
+
+        def replace(match):
+            kind = match.lastgroup
+            if kind == "keep" or (kind == "tag" and not tags_allowed and not match.group(0).startswith("__")):
+                return match.group(0)
+            slot = self.SLOT_TEMPLATES[kind].format(counts[kind])
+            counts[kind] += 1
+            slots.append((slot, match.group(0)))
+            return slot
+
+        return self.TOKEN_REGEX.sub(replace, text), slots
+
+    def fill(self, translated_template, slots):
+        """按槽位回填原值；译文丢失槽位时返回None"""
+        for slot, value in slots:
+            if slot not in translated_template:
+                return None
+            translated_template = translated_template.replace(slot, value)
+        return translated_template
+
+    def _shingles(self, text):
+        text = text.lower()
+        if len(text) <= self.ngram:
+            return {text}
+        return {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+
+    def _signature(self, shingles):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+            for s in shingles
+        ]
+        return [min(h ^ mask for h in hashes) for mask in self._masks]
+
+    def _band_keys(self, signature):
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _index(self, cache_key):
+        """把一个条目加入LSH分桶（签名在锁外计算）"""
+        band_keys = self._band_keys(self._signature(self._shingles(cache_key)))
+        with self._lock:
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, []).append(cache_key)
+
+    def _index_existing(self, cache_keys):
+        for cache_key in cache_keys:
+            self._index(cache_key)
+
+    def start_indexing(self):
+        """在后台线程为已有条目建立LSH索引；检索不等待，只查询已索引的部分"""
+        with self._lock:
+            if self._indexer is not None:
+                return
+            self._indexer = threading.Thread(
+                target=self._index_existing, args=(list(self.entries),), daemon=True
+            )
+        self._indexer.start()
+
+    def add(self, cache_key, translated_template):
+        """写入精确条目并加入模糊索引"""
+        with self._lock:
+            self.entries[cache_key] = translated_template
+        self._index(cache_key)
+
+    def fuzzy(self, cache_key, limit=3):
+        """返回相似度不低于阈值的候选 [(相似度, 原文模板, 译文模板)]"""
+        self.start_indexing()
+        shingles = self._shingles(cache_key)
+        band_keys = self._band_keys(self._signature(shingles))
+        candidates = set()
+        with self._lock:
+            for band_key in band_keys:
+                candidates.update(self._buckets.get(band_key, ()))
+        candidates.discard(cache_key)
+
+        scored = []
+        for candidate in candidates:
+            other = self._shingles(candidate)
+            similarity = len(shingles & other) / len(shingles | other)
+            if similarity >= self.threshold:
+                scored.append((round(similarity, 3), candidate, self.entries.get(candidate)))
+        scored.sort(reverse=True)
+        return scored[:limit]
@@ -0,0 +1,73 @@
+"""流水线各阶段的函数接口，便于在构建脚本中批量调用"""
+import os
+
+from .translator import HOI4UltimateTranslator
+from .validator import validate_directories
+from .vanilla import build_vanilla_index
+
+
+def resolve_localisation_dir(path):
+    """传入mod根目录时自动定位其 localisation 子目录"""
+    candidate = os.path.join(path, "localisation")
+    return candidate if os.path.isdir(candidate) else path
+
+
+def discover_files(directory_path):
+    """收集本地化文件（按优先级排序）"""
+    return HOI4UltimateTranslator(api_key=None, load_cache=False).collect_files(os.path.abspath(directory_path))
+
+
+def estimate(directory_path, **options):
+    """离线估算待翻译条目和计费字符，不访问网络"""
+    translator = HOI4UltimateTranslator(api_key=None, load_cache=False, **options)
+    try:
+        files = translator.estimate_directory(directory_path)
+    finally:
+        translator.close()
+    return {
+        "files": files,
+        "total_entries": sum(entries for entries, _ in files.values()),
+        "total_chars": sum(chars for _, chars in files.values())
+    }
+
+
+def translate(directory_path, api_key, **options):
+    """翻译整个本地化目录，返回翻译器实例以便读取统计"""
+    translator = HOI4UltimateTranslator(api_key=api_key, **options)
+    try:
+        translator.process_directory(directory_path)
+    finally:
+        translator.close()
+    return translator
+
+
+def translate_workspace(directory_paths, api_key, state_dir=None, **options):
+    """工作区模式：多个mod共用一个调度器、去重缓存、限速器和术语表"""
+    translator = HOI4UltimateTranslator(api_key=api_key, state_dir=state_dir, **options)
+    try:
+        translator.process_workspace([resolve_localisation_dir(p) for p in directory_paths])
+    finally:
+        translator.close()
+    return translator
+
+
+def validate(directory_paths, max_workers=None, **options):
+    """多进程校验一个或多个输出目录，结果合并写入同一份清单，返回 (问题清单, 待重译键)"""
+    if isinstance(directory_paths, (str, os.PathLike)):
+        directory_paths = [directory_paths]
+    return validate_directories(directory_paths, max_workers=max_workers, **options)
+
+
+def index_vanilla(game_dir, index_path="vanilla_index.bin"):
+    """为原版游戏的英文/简体中文本地化生成索引"""
+    return build_vanilla_index(game_dir, index_path)
+
+
+def retranslate(failed_keys_file, api_key, **options):
+    """只重译校验失败的条目"""
+    translator = HOI4UltimateTranslator(api_key=api_key, **options)
+    try:
+        translator.retranslate_failed_keys(failed_keys_file)
+    finally:
+        translator.close()
+    return translator
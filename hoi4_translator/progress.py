@@ -0,0 +1,33 @@
+"""跨线程翻译进度统计"""
+import threading
+import time
+
+
+class TranslationProgress:
+    """条目/字符级进度统计：每个线程只写自己的计数器，读取时汇总，热路径无锁"""
+    FIELDS = ("files", "entries", "chars", "done_chars", "requests", "cache_hits",
+              "vanilla_hits", "retries", "retry_backlog")
+    
+    def __init__(self, total_files=0, total_entries=0, total_chars=0):
+        self.total_files = total_files
+        self.total_entries = total_entries
+        self.total_chars = total_chars
+        self.start_time = time.time()
+        self._local = threading.local()
+        self._counters = []
+    
+    def add(self, field, amount=1):
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            counters = dict.fromkeys(self.FIELDS, 0)
+            self._local.counters = counters
+            self._counters.append(counters)
+        counters[field] += amount
+    
+    def snapshot(self):
+        totals = dict.fromkeys(self.FIELDS, 0)
+        for counters in list(self._counters):
+            for field in self.FIELDS:
+                totals[field] += counters[field]
+        totals["elapsed"] = max(time.time() - self.start_time, 1e-6)
+        return totals
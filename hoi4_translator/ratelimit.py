@@ -0,0 +1,22 @@
+"""全局请求限速（所有线程、所有mod共享）"""
+import threading
+import time
+
+
+class RateLimiter:
+    """按固定间隔放行请求；requests_per_second 为 None 时不限速"""
+
+    def __init__(self, requests_per_second=None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
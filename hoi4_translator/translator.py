@@ -0,0 +1,1341 @@
+"""HOI4 Mod终极汉化引擎（网络与界面库按需延迟导入）"""
+import os
+import re
+import shutil
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from .memory import TranslationMemory
+from .progress import TranslationProgress
+from .ratelimit import RateLimiter
+from .vanilla import VanillaIndex
+from .validator import check_loc_value
+
+
+# DeepL接口地址（--backend free/pro，也可直接填写本地模拟服务的URL）
+DEEPL_BACKENDS = {
+    "free": "https://api-free.deepl.com/v2",
+    "pro": "https://api.deepl.com/v2"
+}
+
+
+def resolve_api_base(backend=None, api_key=None):
+    """解析API根地址：free/pro/URL，未指定时按密钥后缀 :fx 判断免费版"""
+    if backend in DEEPL_BACKENDS:
+        return DEEPL_BACKENDS[backend]
+    if backend:
+        return backend.rstrip("/")
+    if api_key and not api_key.endswith(":fx"):
+        return DEEPL_BACKENDS["pro"]
+    return DEEPL_BACKENDS["free"]
+
+
+class QuotaExhausted(Exception):
+    """DeepL字符额度耗尽或达到本次运行预算"""
+
+
+class HOI4UltimateTranslator:
+    def __init__(self, api_key, source_lang="EN", target_lang="ZH", max_workers=4,
+                 api_base=None, use_server_glossary=True, char_budget=None,
+                 usage_check_interval=30, chunk_threshold=1000, chunk_size=600,
+                 chunk_batch_size=10, max_retries=3, dashboard_interval=0.5,
+                 state_dir=None, requests_per_second=None, fuzzy_review=True,
+                 vanilla_index=None, load_cache=True):
+        """
+        HOI4 Mod终极汉化工具 v4.0 - 专业钢铁雄心4版
+        专为HOI4 MOD优化，支持军事术语保护、变量保护和上下文感知翻译
+        """
+        self.api_key = api_key
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.max_workers = max_workers
+        # 术语表、缓存、进度等状态文件目录（默认当前目录，工作区模式下多个mod共用）
+        self.state_dir = state_dir or ""
+        if self.state_dir:
+            os.makedirs(self.state_dir, exist_ok=True)
+        # API根地址可替换为本地模拟服务，便于离线测试
+        self.api_base = resolve_api_base(api_base, api_key)
+        self.endpoint = f"{self.api_base}/translate"
+        self.glossary_endpoint = f"{self.api_base}/glossaries"
+        
+        # DeepL服务端术语表（同步成功后不再做客户端__GLOSSARY__替换）
+        self.use_server_glossary = use_server_glossary
+        self.glossary_id = None
+        self.glossary_state_file = self._state_path("deepl_glossary_state.json")
+        
+        # 额度规划（/usage查询 + 本地计费字符统计）
+        self.usage_endpoint = f"{self.api_base}/usage"
+        self.char_budget = char_budget            # 用户指定的本次运行字符上限
+        self.usage_check_interval = usage_check_interval
+        self.quota_margin = 1000                  # 预留安全余量，防止并发请求超额
+        self.run_char_limit = None
+        self.billed_chars = 0
+        self.quota_stop = False
+        self.last_usage_check = 0
+        self._quota_lock = threading.Lock()      # 预算检查与计费累加必须原子执行
+        self.progress_file = self._state_path("translation_progress.json")
+        self.completed_files = []
+        self.interrupted_files = []
+        self.deferred_files = []
+        self.file_estimates = {}
+        
+        # 实时进度面板与请求重试
+        self.progress = TranslationProgress()
+        self.dashboard_interval = dashboard_interval
+        self.max_retries = max_retries
+        self.retry_status_codes = (429, 500, 502, 503, 504, 529)
+        self.rate_limiter = RateLimiter(requests_per_second)
+        
+        # 共享翻译缓存（按保护后的原文去重，进行中的相同请求只发送一次）
+        self.cache_file = self._state_path("translation_cache.json")
+        # 离线估算和收集文件用不到缓存，跳过解析以便立即启动
+        self.translation_cache = self.load_translation_cache() if load_cache else {}
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.refresh_cache = False                # 定向重译时跳过缓存，重新请求DeepL
+        
+        # 翻译记忆：数字归一为模板槽位，未命中时收集相似译文供审校
+        self.memory = TranslationMemory(self.translation_cache)
+        self.fuzzy_review = fuzzy_review
+        self.memory_review = []
+        
+        # 原版官方译文索引（mmap按需读取）
+        self.vanilla = VanillaIndex(vanilla_index) if vanilla_index else None
+        
+        # 增强的智能正则表达式系统（HOI4专用）
+        self.text_regex = re.compile(r'^(\s*[^\s:]+(?::\d+)?\s+)(".*?")$', re.MULTILINE)
+        self.var_regex = re.compile(
+            r'(\$[a-zA-Z0-9_]+?\$|'  # 标准变量 $VARIABLE$
+            r'§[HhYyGg]|'            # 颜色代码 §H, §Y等
+            r'§[a-zA-Z0-9_]+|'       # 其他§开头的代码
+            r'%[a-zA-Z0-9_]+%|'      # %变量%
+            r'(?<![A-Za-z0-9_])[A-Z]{3,}_[A-Z0-9_]+)'  # 国家代码+变量名 GER_INVASION_FORCE（不匹配占位符内部）
+        )
+        self.key_extract_regex = re.compile(r'^\s*([^\s:]+)')
+        
+        # 超长文本分块（事件描述等），只在 \n 转义或句末切分
+        self.chunk_threshold = chunk_threshold
+        self.chunk_size = chunk_size
+        self.chunk_batch_size = chunk_batch_size
+        self.chunk_boundary_regex = re.compile(r'(?:\\n)+|(?<=[.!?。！？])\s+')
+        self.placeholder_regex = re.compile(r'__(?:HOI4_VAR_\d+|[NT]\d+|PROTECTED_.+?|GLOSSARY_.+?)__')
+        
+        # 统计系统
+        self.processed_count = 0
+        self.error_count = 0
+        self.format_fixes = 0
+        self.reference_replacements = 0
+        self.protected_count = 0
+        self.quality_log = []  # 翻译质量日志
+        
+        # 智能缓存系统
+        self.translation_map = {}
+        self.global_translation_map = {}
+        self.protected_terms = self.load_protected_terms()
+        
+        # 加载基础术语表（HOI4专用）
+        self.glossary = self.load_glossary()
+        hoi4_glossary = self.load_hoi4_glossary()
+        # 合并术语表（HOI4基础术语优先）
+        for term, translation in hoi4_glossary.items():
+            if term not in self.glossary:
+                self.glossary[term] = translation
+        
+        # 智能排序系统
+        self.file_priority = {
+            "l_english.yml": 0,
+            "l_simp_chinese.yml": 100,
+            "focuses.yml": 10,
+            "events.yml": 20,
+            "ideas.yml": 30,
+            "decisions.yml": 40
+        }
+    
+    def load_protected_terms(self):
+        """加载HOI4专有名词保护列表"""
+        hoi4_terms = [
+            # 国家与阵营
+            "Axis", "Allies", "Comintern", "Faction", "Reich", "Reichskommissariat",
+            "Entente", "Alliance", "Pact", "Coalition", "Central Powers",
+            
+            # 军事术语
+            "Division", "Battalion", "Brigade", "Garrison", "Manpower", "Equipment",
+            "Organization", "Combat Width", "Breakthrough", "Soft Attack", "Hard Attack",
+            "Armor", "Piercing", "Air Superiority", "CAS", "Strategic Bombing", "Encryption",
+            "Decryption", "Recon", "Entrenchment", "Supply", "Logistics", "Attrition",
+            "Reinforcement", "Deployment", "Mobilization", "Conscription", "Reserves",
+            
+            # 游戏机制
+            "Focus", "National Focus", "Decision", "Event", "Idea", "Doctrine", "Spy",
+            "Stability", "War Support", "Compliance", "Resistance", "Collaboration",
+            "Ideology", "Democracy", "Fascism", "Communism", "Neutrality", 
+            "Production", "Research", "Technology", "Factory", "Dockyard", "Resource",
+            "Trade", "Economy", "Diplomacy", "Politics", "Propaganda",
+            
+            # 特定装备
+            "Panzer", "Tiger", "Panther", "Sherman", "Zero", "Spitfire", "Bf 109", "IL-2",
+            "Bismarck", "Yamato", "Enterprise", "T-34", "KV-1", "IS-2", "P-51", "Fw 190",
+            
+            # 历史人物
+            "Hitler", "Stalin", "Churchill", "Roosevelt", "Mussolini", "Hirohito",
+            "Zhukov", "Rommel", "Patton", "Montgomery", "Eisenhower", "Yamamoto",
+            "De Gaulle", "Tito", "Chiang", "Mao", "Tojo", "Himmler", "Goering",
+            
+            # 地名和战役
+            "Barbarossa", "Normandy", "Stalingrad", "Berlin", "Moscow", "London", "Paris",
+            "Pearl Harbor", "Midway", "Guadalcanal", "El Alamein", "Dunkirk", "Kursk",
+            "Ardennes", "Okinawa", "Iwo Jima", "Warsaw", "Kiev", "Leningrad", "Volga",
+            
+            # 历史事件和概念
+            "Blitzkrieg", "Anschluss", "Appeasement", "Manhattan Project", "Enigma",
+            "Holocaust", "Final Solution", "Kamikaze", "Valkyrie", "Operation", 
+            "Luftwaffe", "Wehrmacht", "Red Army", "SS", "Gestapo", "NKVD", "RAF", "USAAF",
+            
+            # 国家代码
+            "GER", "SOV", "USA", "ENG", "FRA", "ITA", "JAP", "POL", "CHI", "SPR", "SPA"
+        ]
+        
+        try:
+            terms_file = self._state_path("protected_terms.json")
+            if os.path.exists(terms_file):
+                with open(terms_file, "r", encoding="utf-8") as f:
+                    user_terms = json.load(f)
+                    return list(set(hoi4_terms + user_terms))  # 合并系统与用户术语
+        except:
+            pass
+        return hoi4_terms
+    
+    def load_hoi4_glossary(self):
+        """加载HOI4基础术语表"""
+        hoi4_glossary = {
+            "army_experience": "陆军经验",
+            "navy_experience": "海军经验",
+            "air_experience": "空军经验",
+            "command_power": "指挥点数",
+            "political_power": "政治点数",
+            "stability": "稳定度",
+            "war_support": "战争支持度",
+            "division_template": "师模板",
+            "combat_width": "战斗宽度",
+            "front_line": "前线",
+            "encirclement": "包围",
+            "supply": "补给",
+            "logistics": "后勤",
+            "conscription_law": "征兵法案",
+            "economy_law": "经济法案",
+            "trade_law": "贸易法案",
+            "war_economy": "战时经济",
+            "partial_mobilization": "部分动员",
+            "service_by_requirement": "义务兵役制",
+            "all_volunteers": "全志愿兵役制",
+            "scraping_the_barrel": "榨干他们",
+            "war_propaganda": "战争宣传",
+            "ideological_crusade": "意识形态圣战",
+            "desperate_defense": "绝望防御",
+            "blitzkrieg": "闪电战",
+            "grand_battleplan": "大规模计划",
+            "superior_firepower": "优势火力",
+            "mass_assault": "人海战术",
+            "battle_plan": "作战计划",
+            "planning_bonus": "计划加成",
+            "entrenchment": "战壕",
+            "reinforce_rate": "增援率",
+            "attack": "攻击",
+            "defense": "防御",
+            "breakthrough": "突破",
+            "armor": "装甲",
+            "piercing": "穿甲",
+            "hardness": "硬度",
+            "air_superiority": "空中优势",
+            "close_air_support": "近距离空中支援",
+            "strategic_bomber": "战略轰炸机",
+            "nuclear_bomb": "核弹",
+            "resistance": "抵抗运动",
+            "compliance": "顺从度",
+            "collaboration_government": "合作政府",
+            "collaborationist": "合作者"
+        }
+        return hoi4_glossary
+    
+    def load_glossary(self):
+        """加载用户术语表"""
+        try:
+            glossary_file = self._state_path("translation_glossary.json")
+            if os.path.exists(glossary_file):
+                with open(glossary_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except:
+            pass
+        return {}
+    
+    def _is_term(self, translation):
+        """用户/基础术语表中的纯文本译法（自动学习的条目带原文，旧版学习的是整行）"""
+        return isinstance(translation, str) and '"' not in translation and not self.text_regex.match(translation)
+
+    def _learned_translation(self, key, value):
+        """按键查术语表：术语直接使用；自动学习的条目只在原文一致时复用（不同mod可能有同名键）"""
+        entry = self.glossary.get(key)
+        if self._is_term(entry):
+            return entry
+        if isinstance(entry, dict) and entry.get("source") == value:
+            return entry.get("translation")
+        return None
+
+    def save_glossary(self):
+        """保存自动生成的术语表"""
+        if not self.glossary:
+            return
+            
+        try:
+            with open(self._state_path("translation_glossary.json"), "w", encoding="utf-8") as f:
+                json.dump(self.glossary, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"\n无法保存术语表: {str(e)}")
+
+    def _state_path(self, name):
+        """状态文件路径"""
+        return os.path.join(self.state_dir, name)
+
+    def load_translation_cache(self):
+        """加载共享翻译缓存（语言对不一致时忽略）"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+                if cache.get("source_lang") == self.source_lang and cache.get("target_lang") == self.target_lang:
+                    return cache.get("entries", {})
+        except:
+            pass
+        return {}
+
+    def save_memory_review(self):
+        """保存模糊匹配候选，供人工审校"""
+        if not self.memory_review:
+            return
+        try:
+            with open(self._state_path("translation_memory_review.json"), "w", encoding="utf-8") as f:
+                json.dump(self.memory_review, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"\n无法保存翻译记忆审校列表: {str(e)}")
+
+    def save_translation_cache(self):
+        """保存共享翻译缓存"""
+        self.save_memory_review()
+        if not self.translation_cache:
+            return
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "source_lang": self.source_lang,
+                    "target_lang": self.target_lang,
+                    "entries": self.translation_cache
+                }, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"\n无法保存翻译缓存: {str(e)}")
+
+    def _auth_headers(self):
+        """DeepL认证请求头"""
+        return {"Authorization": f"DeepL-Auth-Key {self.api_key}"}
+
+    def _glossary_entries(self):
+        """筛选可上传到DeepL的术语条目（排除自动学习的整行翻译）"""
+        entries = []
+        for term, translation in self.glossary.items():
+            if not isinstance(term, str) or not isinstance(translation, str):
+                continue
+            if not term.strip() or not translation.strip():
+                continue
+            if term != term.strip() or translation != translation.strip():
+                continue
+            if any(c in term + translation for c in "\t\r\n"):
+                continue
+            # 自动学习的条目是完整的本地化行（带引号），不属于术语
+            if '"' in translation or self.text_regex.match(translation):
+                continue
+            entries.append((term, translation))
+        entries.sort()
+        return entries
+
+    def _glossary_hash(self, entries):
+        """计算术语表内容哈希（含语言对）"""
+        payload = json.dumps(
+            [self.source_lang, self.target_lang, entries],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _load_glossary_state(self):
+        """读取上次同步的术语表状态"""
+        try:
+            if os.path.exists(self.glossary_state_file):
+                with open(self.glossary_state_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except:
+            pass
+        return {}
+
+    def _save_glossary_state(self, state):
+        """保存术语表同步状态"""
+        try:
+            with open(self.glossary_state_file, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"\n无法保存术语表同步状态: {str(e)}")
+
+    def sync_glossary(self):
+        """同步术语表到DeepL服务端，内容未变化时复用已有术语表ID"""
+        import requests
+        
+        self.glossary_id = None
+        if not self.use_server_glossary:
+            return None
+
+        entries = self._glossary_entries()
+        if not entries:
+            return None
+
+        content_hash = self._glossary_hash(entries)
+        state = self._load_glossary_state()
+        old_id = state.get("glossary_id")
+
+        try:
+            # 哈希一致且服务端仍存在时直接复用
+            if old_id and state.get("hash") == content_hash:
+                response = requests.get(
+                    f"{self.glossary_endpoint}/{old_id}",
+                    headers=self._auth_headers(), timeout=30
+                )
+                if response.status_code == 200:
+                    self.glossary_id = old_id
+                    return old_id
+
+            # 内容已变化：删除旧术语表（失败不影响后续）
+            if old_id:
+                try:
+                    requests.delete(
+                        f"{self.glossary_endpoint}/{old_id}",
+                        headers=self._auth_headers(), timeout=30
+                    )
+                except Exception:
+                    pass
+
+            tsv = "\n".join(f"{term}\t{translation}" for term, translation in entries)
+            data = {
+                "name": f"hoi4_ultimate_translator_{content_hash[:12]}",
+                "source_lang": self.source_lang,
+                "target_lang": self.target_lang,
+                "entries": tsv,
+                "entries_format": "tsv"
+            }
+            response = requests.post(
+                self.glossary_endpoint, headers=self._auth_headers(), data=data, timeout=60
+            )
+            response.raise_for_status()
+            self.glossary_id = response.json()["glossary_id"]
+            self._save_glossary_state({
+                "glossary_id": self.glossary_id,
+                "hash": content_hash,
+                "entry_count": len(entries),
+                "source_lang": self.source_lang,
+                "target_lang": self.target_lang
+            })
+            print(f"已同步DeepL术语表: {len(entries)} 个条目")
+            return self.glossary_id
+
+        except Exception as e:
+            print(f"\n术语表同步失败，改用本地术语替换: {str(e)}")
+            self.glossary_id = None
+            return None
+
+    def check_usage(self):
+        """查询DeepL字符用量，失败时返回None"""
+        import requests
+        
+        try:
+            response = requests.get(self.usage_endpoint, headers=self._auth_headers(), timeout=30)
+            response.raise_for_status()
+            usage = response.json()
+            self.last_usage_check = time.time()
+            return usage["character_count"], usage["character_limit"]
+        except Exception as e:
+            print(f"\n无法查询DeepL用量: {str(e)}")
+            return None
+
+    def _estimate_file(self, file_path):
+        """估算文件的待翻译条目数和计费字符数"""
+        entries, billed, _ = self._scan_file(file_path)
+        return entries, billed
+
+    def _scan_file(self, file_path):
+        """扫描文件，返回 (条目数, 计费字符, 进度字符)
+
+        计费字符跳过术语表和翻译缓存命中的条目；进度字符包含所有非原版条目，
+        无论由DeepL、缓存还是术语表完成都会推进进度。
+        """
+        entries = 0
+        billed = 0
+        work = 0
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    line = line.rstrip('\r\n')
+                    if not self.text_regex.match(line):
+                        continue
+                    entries += 1
+                    key_match = self.key_extract_regex.match(line)
+                    key = key_match.group(1).strip() if key_match else None
+                    value = self.text_regex.match(line).group(2)[1:-1]  # 只计引号内文本
+                    if self.vanilla and self.vanilla.resolve(key, value) is not None:
+                        continue
+                    template = self._billed_template(value)
+                    work += len(template)
+                    if key and self._learned_translation(key, value) is not None:
+                        continue
+                    if f"{self._context_hints(line)}\x1f{template}" in self.translation_cache:
+                        continue
+                    billed += len(template)
+        except Exception:
+            pass
+        return entries, billed, work
+
+    def _billed_template(self, value):
+        """实际发送的文本（保护占位符、数字槽位），即计费字符和缓存键的来源"""
+        protected_text, _ = self._replace_special_content(value, count=False)
+        return self.memory.to_template(protected_text)[0]
+
+    def _billed_length(self, value):
+        """按实际发送的文本计算计费字符"""
+        return len(self._billed_template(value))
+
+    def _set_run_limit(self):
+        """按DeepL剩余额度和用户预算确定本次运行的字符上限（均未知时不限制）"""
+        usage = self.check_usage()
+        limits = []
+        if usage:
+            count, limit = usage
+            limits.append(limit - count - self.quota_margin)
+            print(f"DeepL额度: 已用 {count} / {limit} 字符")
+        if self.char_budget is not None:
+            limits.append(self.char_budget)
+        self.run_char_limit = max(0, min(limits)) if limits else None
+        return self.run_char_limit
+
+    def _plan_quota(self, sorted_files):
+        """按优先级在剩余额度内规划本次要处理的文件"""
+        if self._set_run_limit() is None:
+            return list(sorted_files), []
+        
+        planned, deferred = [], []
+        remaining = self.run_char_limit
+        for file_path in sorted_files:
+            if file_path not in self.file_estimates:
+                self.file_estimates[file_path] = self._scan_file(file_path)
+            estimate = self.file_estimates[file_path][1]
+            if estimate <= remaining:
+                planned.append(file_path)
+                remaining -= estimate
+            else:
+                deferred.append(file_path)
+        
+        if deferred:
+            print(f"额度不足: 本次处理 {len(planned)} 个文件，{len(deferred)} 个文件延后")
+        return planned, deferred
+
+    def _refresh_usage(self):
+        """运行中定期复查用量，接近上限时停止派发新请求（按 usage_check_interval 节流）"""
+        with self._quota_lock:
+            if time.time() - self.last_usage_check < self.usage_check_interval:
+                return
+            self.last_usage_check = time.time()
+        usage = self.check_usage()
+        if usage:
+            count, limit = usage
+            if limit - count <= self.quota_margin:
+                self.quota_stop = True
+
+    def _read_progress_file(self):
+        """读取进度文件，返回 {目录范围: 进度}（兼容只记录单个目录的旧格式）"""
+        try:
+            if os.path.exists(self.progress_file):
+                with open(self.progress_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if "directory" in data:
+                    return {data["directory"]: data}
+                return data.get("scopes", {})
+        except:
+            pass
+        return {}
+
+    def _load_progress(self, scope):
+        """读取可续传的进度（按目录或同一组工作区目录分别记录）"""
+        return self._read_progress_file().get(scope, {})
+
+    def _save_progress(self, scope, completed, pending):
+        """保存本目录范围的续传进度，全部完成时只移除本范围，其他目录的进度保持不变"""
+        try:
+            scopes = self._read_progress_file()
+            if pending:
+                scopes[scope] = {
+                    "directory": scope,
+                    "completed": sorted(completed),
+                    "pending": list(pending)
+                }
+            else:
+                scopes.pop(scope, None)
+            
+            if not scopes:
+                if os.path.exists(self.progress_file):
+                    os.remove(self.progress_file)
+                return
+            with open(self.progress_file, "w", encoding="utf-8") as f:
+                json.dump({"scopes": scopes}, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"\n无法保存进度: {str(e)}")
+
+    def _deepl_translate(self, texts, context=None):
+        """批量调用DeepL翻译接口，返回与输入顺序一致的译文列表"""
+        self._refresh_usage()
+        chars = sum(len(t) for t in texts)
+        # 先在锁内预留字符，并发请求不会越过预算；请求失败时退回
+        with self._quota_lock:
+            if self.quota_stop:
+                raise QuotaExhausted("字符额度已用尽")
+            if self.run_char_limit is not None and self.billed_chars + chars > self.run_char_limit:
+                self.quota_stop = True
+                raise QuotaExhausted("已达到本次运行的字符预算")
+            self.billed_chars += chars
+        try:
+            result = self._post_translate(texts, context)
+        except BaseException:
+            with self._quota_lock:
+                self.billed_chars -= chars
+            raise
+        self.progress.add("requests")
+        self.progress.add("chars", chars)
+        return result
+
+    def _post_translate(self, texts, context=None):
+        """发送翻译请求"""
+        import requests
+        
+        data = {
+            "text": list(texts),
+            "source_lang": self.source_lang,
+            "target_lang": self.target_lang,
+            "preserve_formatting": "1",
+            "tag_handling": "xml"
+        }
+        if self.glossary_id:
+            data["glossary_id"] = self.glossary_id
+        if context:
+            data["context"] = context  # 上下文提示不翻译、不计费
+
+        # 429/5xx与网络错误按指数退避重试
+        for attempt in range(self.max_retries + 1):
+            response = None
+            self.rate_limiter.acquire()
+            try:
+                response = requests.post(self.endpoint, headers=self._auth_headers(), data=data, timeout=60)
+            except requests.RequestException:
+                if attempt == self.max_retries:
+                    raise
+            if response is not None:
+                if response.status_code == 456:
+                    self.quota_stop = True
+                    raise QuotaExhausted("DeepL返回456: 字符额度已用尽")
+                if response.status_code not in self.retry_status_codes or attempt == self.max_retries:
+                    break
+            self.progress.add("retries")
+            self.progress.add("retry_backlog")
+            time.sleep(min(2 ** attempt, 30))
+            self.progress.add("retry_backlog", -1)
+        response.raise_for_status()
+        result = response.json()
+        return [item['text'] for item in result['translations']]
+
+    def _replace_special_content(self, text, count=True):
+        """保护游戏变量、专有名词和术语表条目（count=False 时用于估算，不计入统计）"""
+        replacements = {}
+        placeholder_template = "__HOI4_VAR_{}__"
+        
+        # 保护术语表条目（已同步服务端术语表时由DeepL处理）
+        if not self.glossary_id:
+            for term, translation in self.glossary.items():
+                if self._is_term(translation) and term in text:
+                    text = text.replace(term, f"__GLOSSARY_{term}__")
+        
+        # 保护专有名词（只匹配完整单词，不改动 GER_INVASION_FORCE 这类变量名和已有占位符）
+        for term in self.protected_terms:
+            if term in text:
+                marker = f"__PROTECTED_{term}__"
+                text, hits = re.subn(
+                    rf'(?<![A-Za-z0-9_]){re.escape(term)}(?![A-Za-z0-9_])', lambda _: marker, text
+                )
+                if hits and count:
+                    self.protected_count += 1
+        
+        # 保护游戏变量
+        def replace_match(match):
+            var = match.group(0)
+            placeholder = placeholder_template.format(len(replacements))
+            replacements[placeholder] = var
+            return placeholder
+        
+        processed_text = self.var_regex.sub(replace_match, text)
+        return processed_text, replacements
+    
+    def _restore_special_content(self, text, replacements):
+        """恢复所有保护内容"""
+        # 恢复游戏变量
+        for placeholder, var in replacements.items():
+            text = text.replace(placeholder, var)
+        
+        # 恢复专有名词
+        for term in self.protected_terms:
+            text = text.replace(f"__PROTECTED_{term}__", term)
+        
+        # 恢复术语表条目
+        if not self.glossary_id:
+            for term, translation in self.glossary.items():
+                if self._is_term(translation):
+                    text = text.replace(f"__GLOSSARY_{term}__", translation)
+        
+        # HOI4专用后处理修正
+        text = self._hoi4_post_process(text)
+        return text
+    
+    def _hoi4_post_process(self, text):
+        """HOI4专用后处理修正"""
+        # 修正常见误译
+        corrections = {
+            "德国": "德国",  # 防止错误的变体
+            "俄罗斯": "苏联",
+            "苏维埃": "苏联",
+            "坦克": "坦克",
+            "装甲的": "装甲",
+            "分裂": "师",    # division误译修正
+            "焦点": "国策",  # focus误译修正
+            "支持战争": "战争支持度",
+            "战争支持": "战争支持度",
+            "稳定": "稳定度",
+            "稳定性": "稳定度",
+            "战斗计划": "作战计划",
+            "计划奖金": "计划加成",
+            "突破": "突破",
+            "装甲": "装甲",
+            "刺穿": "穿甲",
+            "空中霸权": "空中优势",
+            "近距离空中支援": "近距离空中支援",
+            "战略轰炸机": "战略轰炸机",
+            "原子弹": "核弹",
+            "反抗": "抵抗运动",
+            "依从性": "顺从度",
+            "合作政府": "合作政府",
+            "合作者": "合作者"
+        }
+        
+        for wrong, correct in corrections.items():
+            text = text.replace(wrong, correct)
+        
+        # 确保军事单位格式正确
+        text = re.sub(r'(\d+)(?:st|nd|rd|th)?\s?(步兵师|装甲师|骑兵师|山地师|陆战队|伞兵师|摩托化师|机械化师)', r'\1\2', text)
+        
+        # 确保国家代码后加冒号
+        text = re.sub(r'^([A-Z]{3})\s', r'\1: ', text, flags=re.MULTILINE)
+        
+        return text
+    
+    def _fix_format_issues(self, line):
+        """自动修复格式问题"""
+        # 修复缺失的:0
+        if re.match(r'^\s*[a-zA-Z0-9_]+:?\s+"', line) and ':0' not in line:
+            self.format_fixes += 1
+            return line.replace('"', ':0 "', 1)
+        
+        # 修复不正确的引号
+        if re.match(r'^\s*[a-zA-Z0-9_]+:\d+\s+[^"]', line) and '"' not in line:
+            if ':' in line:
+                parts = line.split(':', 1)
+                return f'{parts[0]}:"{parts[1].strip()}"'
+        
+        return line
+    
+    def _translate_text(self, text):
+        """智能翻译引擎（HOI4优化版）"""
+        if not text.strip() or text.strip().startswith("#"):
+            return text
+        
+        # 修复格式问题
+        original_text = text
+        text = self._fix_format_issues(text)
+        
+        # 提取键名
+        key_match = self.key_extract_regex.match(text)
+        key = key_match.group(1).strip() if key_match else None
+        
+        # 拆分键前缀和引号内文本，只翻译文本部分
+        line_match = self.text_regex.match(text)
+        if line_match:
+            prefix, value = line_match.group(1), line_match.group(2)[1:-1]
+        else:
+            prefix, value = "", text
+        
+        # 原版官方译文优先，不消耗额度
+        if self.vanilla and line_match:
+            official = self.vanilla.resolve(key, value)
+            if official is not None:
+                self.progress.add("entries")
+                self.progress.add("vanilla_hits")
+                return f'{prefix}"{official}"'
+        
+        # 检查是否在术语表中（自动学习的条目要求原文一致）
+        learned = self._learned_translation(key, value) if key else None
+        if learned is not None:
+            self.progress.add("entries")
+            self.progress.add("cache_hits")
+            self.progress.add("done_chars", self._billed_length(value))
+            return f'{prefix}"{learned}"' if line_match else learned
+        
+        # 保护特殊内容
+        protected_text, replacements = self._replace_special_content(value)
+        
+        # HOI4上下文提示
+        context_hints = self._context_hints(text)
+        
+        try:
+            # 上下文提示通过context参数传递，超长文本分块翻译
+            translated_text, cache_hit = self._cached_translate(protected_text, context_hints)
+            
+            # 恢复特殊内容
+            translated_value = self._restore_special_content(translated_text, replacements)
+            final_text = f'{prefix}"{translated_value}"' if line_match else translated_value
+            
+            self.progress.add("entries")
+            self.progress.add("done_chars", len(self.memory.to_template(protected_text)[0]))
+            if cache_hit:
+                self.progress.add("cache_hits")
+            
+            # 质量评估：保留标记是否完整
+            mismatches = [(code, message) for code, message in check_loc_value(final_text, original_text)
+                          if code.endswith("_mismatch")]
+            for code, message in mismatches:
+                self.quality_log.append({
+                    "key": key,
+                    "original": original_text,
+                    "translated": final_text,
+                    "issue": f"{code}: {message}"
+                })
+            
+            # 添加到术语表（连同原文保存；有问题的译文不学习，下次运行重新翻译）
+            if key and not self._is_term(self.glossary.get(key)) and not mismatches:
+                self.glossary[key] = {"source": value, "translation": translated_value}
+            
+            return final_text
+        
+        except QuotaExhausted:
+            raise
+        except Exception as e:
+            print(f"\n翻译出错: {str(e)}")
+            self.error_count += 1
+            return original_text
+    
+    def _context_hints(self, text):
+        """按整行内容（含键名）推断HOI4上下文提示，同时用于缓存键"""
+        text_lower = text.lower()
+        if any(term in text_lower for term in ["event", "option", "desc"]):
+            return "[军事事件]"
+        if "focus" in text_lower:
+            return "[国策]"
+        if any(term in text_lower for term in ["decision", "allowed", "effect"]):
+            return "[决议]"
+        if any(term in text_lower for term in ["division", "battalion", "army", "navy", "air"]):
+            return "[军事单位]"
+        if any(term in text_lower for term in ["idea", "trait", "spirit"]):
+            return "[国家精神]"
+        if any(term in text_lower for term in ["technology", "research", "doctrine"]):
+            return "[科技]"
+        return ""
+    
+    def _cached_translate(self, protected_text, context=None):
+        """查翻译记忆后再翻译：数字归一为模板槽位，相同模板只发送一次，返回 (译文, 是否命中缓存)"""
+        template, slots = self.memory.to_template(protected_text)
+        translated_template, cache_hit = self._translate_template(template, context)
+        translated = self.memory.fill(translated_template, slots)
+        if translated is None:
+            # 译文丢失了槽位，退回直接翻译原文
+            translated, cache_hit = self._translate_template(protected_text, context)
+        return translated, cache_hit
+    
+    def _translate_template(self, protected_text, context=None):
+        """查共享缓存后再翻译；多个线程同时请求相同文本时只发送一次，返回 (译文, 是否命中缓存)"""
+        cache_key = f"{context or ''}\x1f{protected_text}"
+        if not self.refresh_cache and cache_key in self.translation_cache:
+            return self.translation_cache[cache_key], True
+        
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[cache_key] = future
+        if not owner:
+            return future.result(), True
+        
+        try:
+            # 记录相似的已有译文，供人工审校
+            if self.fuzzy_review:
+                candidates = self.memory.fuzzy(cache_key)
+                if candidates:
+                    self.memory_review.append({
+                        "context": context,
+                        "source": protected_text,
+                        "candidates": [
+                            {"similarity": score, "source": key.split("\x1f", 1)[-1], "translation": translation}
+                            for score, key, translation in candidates
+                        ]
+                    })
+            
+            # 超长文本分块翻译
+            if len(protected_text) > self.chunk_threshold:
+                result = self._translate_long_text(protected_text, context)
+            else:
+                result = self._deepl_translate([protected_text], context)[0]
+            if self._cacheable(protected_text, result):
+                self.memory.add(cache_key, result)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+    
+    def _cacheable(self, protected_text, result):
+        """译文保留了全部占位符和标记时才写入缓存，避免坏译文被永久复用"""
+        if sorted(self.placeholder_regex.findall(result)) != sorted(self.placeholder_regex.findall(protected_text)):
+            return False
+        return not any(code.endswith("_mismatch") for code, _ in check_loc_value(result, protected_text))
+    
+    def _split_long_text(self, text):
+        """在 \\n 转义或句末切分超长文本（不切开保护占位符），返回 [(片段, 分隔符)]"""
+        protected_spans = [m.span() for m in self.placeholder_regex.finditer(text)]
+        
+        segments = []
+        pos = 0
+        for boundary in self.chunk_boundary_regex.finditer(text):
+            start = boundary.start()
+            if any(a < start < b for a, b in protected_spans):
+                continue
+            segments.append((text[pos:start], boundary.group(0)))
+            pos = boundary.end()
+        segments.append((text[pos:], ""))
+        
+        # 合并为不超过 chunk_size 的分块，分块之间的分隔符原样保留
+        chunks = []
+        current, current_sep = None, ""
+        for segment, sep in segments:
+            if current is None:
+                current, current_sep = segment, sep
+            elif len(current) + len(current_sep) + len(segment) > self.chunk_size:
+                chunks.append((current, current_sep))
+                current, current_sep = segment, sep
+            else:
+                current = current + current_sep + segment
+                current_sep = sep
+        chunks.append((current, current_sep))
+        return chunks
+    
+    def _translate_long_text(self, text, context=None):
+        """超长文本分块后批量翻译并按原顺序拼接"""
+        chunks = self._split_long_text(text)
+        pending = [i for i, (chunk, _) in enumerate(chunks) if chunk.strip()]
+        translated = {}
+        for start in range(0, len(pending), self.chunk_batch_size):
+            batch = pending[start:start + self.chunk_batch_size]
+            results = self._deepl_translate([chunks[i][0] for i in batch], context)
+            translated.update(zip(batch, results))
+        return "".join(translated.get(i, chunk) + sep for i, (chunk, sep) in enumerate(chunks))
+    
+    def _process_references(self, content):
+        """增强版引用处理系统（支持HOI4多级引用）"""
+        # 查找所有引用模式
+        ref_matches = list(set(re.findall(r'(\$[^\s$]+\$)', content)))
+        
+        # 多级解析（最多3级）
+        for _ in range(3):
+            replacements_made = 0
+            for ref in ref_matches:
+                ref_key = ref.strip('$')
+                
+                if ref_key in self.global_translation_map:
+                    translated_value = self.global_translation_map[ref_key]
+                    # 只替换完整匹配的变量
+                    new_content = re.sub(rf'\${ref_key}\$', translated_value, content)
+                    if new_content != content:
+                        content = new_content
+                        self.reference_replacements += 1
+                        replacements_made += 1
+            
+            # 如果没有新的替换，提前退出
+            if replacements_made == 0:
+                break
+        
+        return content
+    
+    def _process_yaml_file(self, file_path):
+        """高级文件处理引擎（HOI4优化）"""
+        if self.quota_stop:
+            self.interrupted_files.append(file_path)
+            return 0
+        try:
+            # 重置本地缓存
+            self.translation_map = {}
+            local_fixes = 0
+            
+            # 创建备份
+            backup_path = f"{file_path}.backup"
+            if not os.path.exists(backup_path):
+                shutil.copy2(file_path, backup_path)
+            
+            # 读取文件
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            
+            # 预处理：识别并标记需要翻译的行
+            lines = content.split('\n')
+            translated_lines = []
+            
+            # 第一轮：收集所有键值对
+            key_value_map = {}
+            for line in lines:
+                if match := self.text_regex.match(line):
+                    key_match = self.key_extract_regex.match(line)
+                    if key_match:
+                        key = key_match.group(1).strip()
+                        key_value_map[key] = line
+            
+            # 第二轮：按优先级排序
+            sorted_keys = sorted(key_value_map.keys(), key=lambda k: self.file_priority.get(k, 50))
+            
+            # 第三轮：翻译并记录
+            translated_by_line = {}
+            for key in sorted_keys:
+                line = key_value_map[key]
+                translated_line = self._translate_text(line)
+                translated_by_line[line] = translated_line
+                
+                # 记录到全局缓存
+                key_match = self.key_extract_regex.match(translated_line)
+                if key_match:
+                    key_name = key_match.group(1).strip()
+                    self.global_translation_map[key_name] = translated_line
+            
+            # 按原始行序输出（保留BOM、文件头和注释位置，重复键只保留最后一条）
+            for line in lines:
+                if line in translated_by_line:
+                    translated_lines.append(translated_by_line.pop(line))
+                elif not self.text_regex.match(line):
+                    translated_lines.append(line)
+            
+            # 合并处理后的内容
+            translated_content = '\n'.join(translated_lines)
+            
+            # 处理引用
+            translated_content = self._process_references(translated_content)
+            
+            # 保存结果
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(translated_content)
+            
+            self.processed_count += 1
+            self.completed_files.append(file_path)
+            self.progress.add("files")
+            return self.format_fixes - local_fixes
+        
+        except QuotaExhausted:
+            # 额度耗尽：不写入文件，留待下次续传
+            self.interrupted_files.append(file_path)
+            return 0
+        except Exception as e:
+            print(f"\n处理文件 {os.path.basename(file_path)} 时出错: {str(e)}")
+            self.error_count += 1
+            return 0
+    
+    def _render_dashboard(self, pbar):
+        """刷新进度面板：请求/秒、字符/秒、缓存命中率、重试积压和剩余时间"""
+        stats = self.progress.snapshot()
+        elapsed = stats["elapsed"]
+        chars_rate = stats["chars"] / elapsed
+        # 缓存和术语表命中的条目不计费，但同样推进进度
+        done_chars = stats["done_chars"]
+        remaining_chars = max(self.progress.total_chars - done_chars, 0)
+        done_rate = done_chars / elapsed
+        eta = pbar.format_interval(remaining_chars / done_rate) if done_rate > 0 else "?"
+        hit_rate = stats["cache_hits"] / stats["entries"] * 100 if stats["entries"] else 0
+        
+        pbar.n = min(done_chars, pbar.total)
+        pbar.set_postfix_str(
+            f"文件 {stats['files']}/{self.progress.total_files} "
+            f"条目 {stats['entries']}/{self.progress.total_entries} "
+            f"{stats['requests'] / elapsed:.1f}请求/s {chars_rate:.0f}字符/s "
+            f"缓存命中 {hit_rate:.0f}% 重试积压 {stats['retry_backlog']} 剩余 {eta}",
+            refresh=False
+        )
+        pbar.refresh()
+    
+    def _run_dashboard(self, stop_event):
+        """后台线程定时汇总各线程计数，不占用翻译热路径"""
+        from tqdm import tqdm
+        
+        with tqdm(total=max(self.progress.total_chars, 1), desc="汉化进度", unit="字符",
+                  unit_scale=True, bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt}{postfix}") as pbar:
+            while not stop_event.wait(self.dashboard_interval):
+                self._render_dashboard(pbar)
+            self._render_dashboard(pbar)
+    
+    def retranslate_failed_keys(self, failed_keys_file="failed_keys.json"):
+        """只重译校验失败的条目（原文取自 .backup 备份），无需重跑整个文件"""
+        with open(failed_keys_file, "r", encoding="utf-8") as f:
+            failed_keys = json.load(f)
+
+        self.sync_glossary()
+        self._set_run_limit()
+        # 缓存中可能正是这些条目的坏译文，重译时不读缓存，新译文通过检查后覆盖旧条目
+        self.refresh_cache = True
+        retranslated = 0
+        for file_path, keys in failed_keys.items():
+            backup_path = f"{file_path}.backup"
+            if not os.path.exists(backup_path) or not os.path.exists(file_path):
+                print(f"\n跳过 {os.path.basename(file_path)}: 缺少译文或备份文件")
+                continue
+            try:
+                with open(backup_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    source_lines = f.read().split('\n')
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    lines = f.read().split('\n')
+
+                wanted = set(keys)
+                source_by_key = {}
+                for line in source_lines:
+                    key_match = self.key_extract_regex.match(line)
+                    if self.text_regex.match(line) and key_match:
+                        key = key_match.group(1).strip()
+                        if key in wanted:
+                            source_by_key[key] = line
+
+                # 清除自动学习的旧译文，避免直接命中术语表
+                for key in source_by_key:
+                    self.glossary.pop(key, None)
+
+                done = set()
+                for index, line in enumerate(lines):
+                    key_match = self.key_extract_regex.match(line)
+                    key = key_match.group(1).strip() if key_match else None
+                    if key in source_by_key and key not in done:
+                        lines[index] = self._translate_text(source_by_key[key])
+                        done.add(key)
+                # 译文中缺失的条目追加到文件末尾
+                for key, line in source_by_key.items():
+                    if key not in done:
+                        lines.append(self._translate_text(line))
+
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines))
+                retranslated += len(source_by_key)
+
+            except QuotaExhausted:
+                print("\n字符额度已用尽，停止重译")
+                break
+            except Exception as e:
+                print(f"\n重译 {os.path.basename(file_path)} 时出错: {str(e)}")
+                self.error_count += 1
+
+        self.refresh_cache = False
+        self.save_glossary()
+        self.save_translation_cache()
+        print(f"定向重译完成: {retranslated} 个条目")
+        return retranslated
+
+    def close(self):
+        """释放原版索引的文件句柄和mmap"""
+        if self.vanilla:
+            self.vanilla.close()
+            self.vanilla = None
+
+    def collect_files(self, directory_path):
+        """收集目录下所有yml文件并按优先级排序"""
+        yaml_files = []
+        for root, _, files in os.walk(directory_path):
+            for file in files:
+                if file.lower().endswith('.yml'):
+                    full_path = os.path.join(root, file)
+                    # 优先级排序
+                    priority = self.file_priority.get(file, 50)
+                    yaml_files.append((priority, full_path))
+        
+        # 按优先级排序
+        yaml_files.sort(key=lambda x: x[0])
+        return [f[1] for f in yaml_files]
+    
+    def estimate_directory(self, directory_path):
+        """离线估算目录的待翻译条目数和计费字符数，返回 {文件: (条目, 字符)}"""
+        return {f: self._estimate_file(f) for f in self.collect_files(os.path.abspath(directory_path))}
+    
+    def process_directory(self, directory_path):
+        """多线程目录处理系统（优先处理核心文件）"""
+        directory_path = os.path.abspath(directory_path)
+        
+        # 收集所有yml文件
+        sorted_files = self.collect_files(directory_path)
+        if not sorted_files:
+            print("未找到YML文件! 请检查路径是否正确")
+            return
+        
+        print(f"找到 {len(sorted_files)} 个本地化文件，按优先级排序处理中...")
+        self._process_files(sorted_files, directory_path)
+    
+    def process_workspace(self, directory_paths):
+        """工作区模式：多个mod共用一个线程池、限速器、翻译缓存和术语表"""
+        directory_paths = sorted({os.path.abspath(d) for d in directory_paths})
+        
+        # 跨mod统一按优先级排序
+        sorted_files = []
+        for directory_path in directory_paths:
+            files = self.collect_files(directory_path)
+            print(f"{directory_path}: {len(files)} 个本地化文件")
+            sorted_files.extend(files)
+        sorted_files.sort(key=lambda f: self.file_priority.get(os.path.basename(f), 50))
+        
+        if not sorted_files:
+            print("未找到YML文件! 请检查路径是否正确")
+            return
+        
+        print(f"工作区共 {len(directory_paths)} 个mod, {len(sorted_files)} 个本地化文件，统一调度处理中...")
+        self._process_files(sorted_files, os.pathsep.join(directory_paths))
+    
+    def _process_files(self, sorted_files, scope):
+        """共用的调度核心：续传、术语表同步、额度规划、多线程翻译和报告"""
+        total_files = len(sorted_files)
+
+        # 续传：跳过上次已完成的文件
+        progress = self._load_progress(scope)
+        done_before = set(progress.get("completed", []))
+        if done_before:
+            sorted_files = [f for f in sorted_files if f not in done_before]
+            print(f"续传模式: 跳过已完成的 {len(done_before)} 个文件")
+
+        # 同步服务端术语表
+        self.sync_glossary()
+
+        # 额度规划
+        self.file_estimates = {f: self._scan_file(f) for f in sorted_files}
+        sorted_files, self.deferred_files = self._plan_quota(sorted_files)
+
+        # 多线程处理（进度面板在独立线程刷新）
+        self.progress = TranslationProgress(
+            total_files=len(sorted_files),
+            total_entries=sum(self.file_estimates[f][0] for f in sorted_files),
+            total_chars=sum(self.file_estimates[f][2] for f in sorted_files)
+        )
+        stop_dashboard = threading.Event()
+        dashboard = threading.Thread(target=self._run_dashboard, args=(stop_dashboard,), daemon=True)
+        dashboard.start()
+        
+        total_fixes = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self._process_yaml_file, file): file for file in sorted_files}
+                
+                for future in as_completed(futures):
+                    fixes = future.result()
+                    total_fixes += fixes
+                    self._save_progress(
+                        scope,
+                        done_before.union(self.completed_files),
+                        [f for f in sorted_files + self.deferred_files
+                         if f not in done_before and f not in self.completed_files]
+                    )
+        finally:
+            stop_dashboard.set()
+            dashboard.join()
+        
+        # 保存术语表与续传进度
+        self.save_glossary()
+        self.save_translation_cache()
+        pending = self.interrupted_files + self.deferred_files
+        self._save_progress(scope, done_before.union(self.completed_files), pending)
+        
+        # 生成终极报告
+        self.generate_report(total_files, total_fixes)
+    
+    def generate_report(self, total_files, total_fixes):
+        """生成终极质量报告（HOI4专用版）"""
+        stats = self.progress.snapshot()
+        report = [
+            "=" * 70,
+            "HOI4 MOD 汉化终极报告",
+            "=" * 70,
+            f"处理文件总数: {total_files}",
+            f"成功处理文件: {self.processed_count}",
+            f"错误文件数: {self.error_count}",
+            "-" * 70,
+            f"自动格式修复: {total_fixes} 处",
+            f"变量引用替换: {self.reference_replacements} 处",
+            f"专有名词保护: {self.protected_count} 处",
+            f"术语表条目: {len(self.glossary)} 个",
+            f"服务端术语表: {self.glossary_id or '未启用'}",
+            f"计费字符数: {self.billed_chars}",
+            f"翻译请求: {stats['requests']} 次, 缓存命中: {stats['cache_hits']} 条, 重试: {stats['retries']} 次",
+            f"翻译记忆: {len(self.translation_cache)} 条模板, {len(self.memory_review)} 条模糊候选待审校",
+            f"原版译文复用: {stats['vanilla_hits']} 条",
+            "=" * 70,
+            "翻译质量评估:"
+        ]
+        
+        # 质量评估
+        if self.error_count == 0 and self.processed_count == total_files:
+            report.append("★ 完美 - 所有文件处理成功，无错误")
+        elif self.error_count / total_files < 0.05:
+            report.append("☆ 优秀 - 少数文件存在小问题")
+        else:
+            report.append("⚠ 一般 - 存在较多问题，建议检查")
+        
+        # 添加质量日志信息
+        if self.quality_log:
+            report.append(f"-" * 70)
+            report.append(f"翻译质量警告: {len(self.quality_log)} 处潜在问题")
+            report.append(f"已保存到: {self._state_path('translation_quality_log.json')}")
+            
+            # 保存详细日志
+            with open(self._state_path("translation_quality_log.json"), "w", encoding="utf-8") as f:
+                json.dump(self.quality_log, f, ensure_ascii=False, indent=2)
+        
+        # 额度中断信息
+        pending = len(self.interrupted_files) + len(self.deferred_files)
+        if pending:
+            report.append("-" * 70)
+            report.append(f"额度限制: {pending} 个文件未处理，进度已保存到 {self.progress_file}")
+            report.append("额度恢复后重新运行本工具即可从断点继续")
+        
+        report.extend([
+            "=" * 70,
+            "下一步操作指南:",
+            "1. 在.mod文件中添加: language = \"l_simp_chinese\"",
+            "2. 在游戏中测试汉化效果",
+            "3. 检查术语表(translation_glossary.json)，优化特定术语",
+            "4. 扩展保护列表(protected_terms.json)，添加更多专有名词",
+            "5. 查看翻译质量日志(translation_quality_log.json)，修正问题条目",
+            "=" * 70,
+            "高级提示:",
+            "- 重新运行本工具会自动使用术语表，确保一致性",
+            "- 优先处理核心文件：焦点、事件、决议和军事单位文件",
+            "- 对于大型MOD，可分多次运行以避免API限制",
+            "- 使用引用替换计数检查变量引用是否完整",
+            "=" * 70
+        ])
+        
+        print("\n" + "\n".join(report))
@@ -0,0 +1,175 @@
+"""HOI4本地化输出校验（纯标准库，可在子进程中并行运行）"""
+import os
+import re
+import json
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+LOC_HEADER_REGEX = re.compile(r'^l_([a-z_]+):\s*(#.*)?$')
+LOC_ENTRY_REGEX = re.compile(r'^\s*([A-Za-z0-9_.\-]+):(\d+)?\s*"(.*)"\s*(#.*)?$')
+LOC_VAR_REGEX = re.compile(r'\$[^$\s"]+\$')
+LOC_SCRIPTED_REGEX = re.compile(r'\[[^\[\]"]+\]')
+LOC_ICON_REGEX = re.compile(r'£[A-Za-z0-9_|]+')
+LOC_COLOR_OPEN_REGEX = re.compile(r'§[A-Za-z0-9]')
+LOC_COLOR_CLOSE = "§!"
+
+
+def extract_loc_tokens(value):
+    """提取本地化文本中必须原样保留的标记"""
+    return {
+        "vars": Counter(LOC_VAR_REGEX.findall(value)),
+        "scripted_loc": Counter(LOC_SCRIPTED_REGEX.findall(value)),
+        "icons": Counter(LOC_ICON_REGEX.findall(value)),
+        "colors": Counter(LOC_COLOR_OPEN_REGEX.findall(value.replace(LOC_COLOR_CLOSE, "")))
+    }
+
+
+def check_loc_value(value, source_value=None):
+    """校验单条文本，返回 (问题代码, 说明) 列表"""
+    issues = []
+    unescaped = len(re.findall(r'(?<!\\)"', value))
+    if unescaped % 2:
+        issues.append(("unbalanced_quotes", "文本内引号不成对"))
+    
+    opens = len(LOC_COLOR_OPEN_REGEX.findall(value.replace(LOC_COLOR_CLOSE, "")))
+    closes = value.count(LOC_COLOR_CLOSE)
+    if opens != closes:
+        issues.append(("unbalanced_color", f"§颜色代码未闭合: {opens} 个开始, {closes} 个§!"))
+    
+    if source_value is not None:
+        source_tokens = extract_loc_tokens(source_value)
+        target_tokens = extract_loc_tokens(value)
+        for name in ("vars", "scripted_loc", "icons", "colors"):
+            if source_tokens[name] != target_tokens[name]:
+                missing = sorted((source_tokens[name] - target_tokens[name]).elements())
+                extra = sorted((target_tokens[name] - source_tokens[name]).elements())
+                issues.append((f"{name}_mismatch", f"缺失: {missing} 多出: {extra}"))
+    return issues
+
+
+def parse_loc_entries(lines):
+    """解析本地化条目，返回 {键: (行号, 文本)}"""
+    entries = {}
+    for number, line in enumerate(lines, 1):
+        match = LOC_ENTRY_REGEX.match(line)
+        if match:
+            entries[match.group(1)] = (number, match.group(3))
+    return entries
+
+
+def validate_loc_file(file_path, source_path=None):
+    """校验单个本地化文件（可在子进程中运行）"""
+    issues = []
+    
+    def add(code, message, line=None, key=None):
+        issues.append({
+            "file": file_path, "line": line, "key": key,
+            "code": code, "message": message
+        })
+    
+    try:
+        with open(file_path, "rb") as f:
+            raw = f.read()
+    except Exception as e:
+        add("unreadable", str(e))
+        return issues
+    
+    if not raw.startswith(b"\xef\xbb\xbf"):
+        add("missing_bom", "文件缺少UTF-8 BOM")
+    try:
+        lines = raw.decode("utf-8-sig").splitlines()
+    except UnicodeDecodeError as e:
+        add("bad_encoding", f"不是有效的UTF-8: {e}")
+        return issues
+    
+    # 文件头 l_<language>:
+    header_seen = False
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if not header_seen:
+            header = LOC_HEADER_REGEX.match(stripped)
+            if not header:
+                add("missing_header", "首个有效行不是 l_<language>: 文件头", number)
+            else:
+                name_lang = re.search(r'_l_([a-z_]+)\.yml$', os.path.basename(file_path).lower())
+                if name_lang and name_lang.group(1) != header.group(1):
+                    add("header_mismatch", f"文件名语言 {name_lang.group(1)} 与文件头 l_{header.group(1)} 不一致", number)
+            header_seen = True
+            if header:
+                continue
+        
+        match = LOC_ENTRY_REGEX.match(line)
+        if not match:
+            add("syntax", '不符合 key:N "value" 格式', number)
+            continue
+        for code, message in check_loc_value(match.group(3)):
+            add(code, message, number, match.group(1))
+    
+    # 与原文对比保留标记
+    if source_path and os.path.exists(source_path):
+        try:
+            with open(source_path, "r", encoding="utf-8-sig", errors="ignore") as f:
+                source_entries = parse_loc_entries(f.read().splitlines())
+        except Exception as e:
+            add("unreadable_source", str(e))
+            return issues
+        target_entries = parse_loc_entries(lines)
+        for key, (_, source_value) in source_entries.items():
+            if key not in target_entries:
+                add("missing_key", "译文中缺少该条目", None, key)
+                continue
+            number, value = target_entries[key]
+            for code, message in check_loc_value(value, source_value):
+                if code.endswith("_mismatch"):
+                    add(code, message, number, key)
+    return issues
+
+
+def validate_directory(directory_path, max_workers=None, output_dir=None,
+                       issues_file="validation_issues.json", failed_keys_file="failed_keys.json"):
+    """多进程校验输出目录，生成问题清单和待重译键列表（文件路径均为绝对路径）"""
+    return validate_directories([directory_path], max_workers, output_dir, issues_file, failed_keys_file)
+
+
+def validate_directories(directory_paths, max_workers=None, output_dir=None,
+                         issues_file="validation_issues.json", failed_keys_file="failed_keys.json"):
+    """多个目录共用一个进程池校验，结果合并写入同一份问题清单和待重译键列表"""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        issues_file = os.path.join(output_dir, issues_file)
+        failed_keys_file = os.path.join(output_dir, failed_keys_file)
+    
+    jobs = []
+    for directory_path in directory_paths:
+        for root, _, files in os.walk(os.path.abspath(directory_path)):
+            for file in files:
+                if file.lower().endswith('.yml'):
+                    full_path = os.path.join(root, file)
+                    jobs.append((full_path, f"{full_path}.backup"))
+    
+    issues = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(validate_loc_file, path, source) for path, source in jobs]
+        for future in as_completed(futures):
+            issues.extend(future.result())
+    issues.sort(key=lambda i: (i["file"], i["line"] or 0, i["code"]))
+    
+    failed_keys = {}
+    for issue in issues:
+        if issue["key"]:
+            keys = failed_keys.setdefault(issue["file"], [])
+            if issue["key"] not in keys:
+                keys.append(issue["key"])
+    
+    with open(issues_file, "w", encoding="utf-8") as f:
+        json.dump(issues, f, ensure_ascii=False, indent=2)
+    with open(failed_keys_file, "w", encoding="utf-8") as f:
+        json.dump(failed_keys, f, ensure_ascii=False, indent=2)
+    
+    print(f"校验完成: {len(jobs)} 个文件, {len(issues)} 个问题, "
+          f"{sum(len(k) for k in failed_keys.values())} 个条目待重译")
+    print(f"问题清单: {issues_file}  待重译键: {failed_keys_file}")
+    return issues, failed_keys
@@ -0,0 +1,150 @@
+"""原版游戏本地化复用：把官方英文/简体中文文件编入紧凑的磁盘索引，mmap按需查询"""
+import hashlib
+import mmap
+import os
+import struct
+from collections import Counter
+
+from .validator import parse_loc_entries
+
+INDEX_MAGIC = b"HOI4VIX1"
+# 魔数, 键条目数, 原文条目数, 键表偏移, 原文表偏移
+HEADER = struct.Struct("<8sIIQQ")
+# 哈希, 记录在数据区中的偏移（按哈希排序，二分查找）
+RECORD = struct.Struct("<QQ")
+LENGTH = struct.Struct("<I")
+
+
+def _hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def read_language_entries(game_dir, language):
+    """读取原版某种语言的全部条目 {键: 文本}（兼容 localisation/<语言>/ 子目录和旧的平铺结构）"""
+    suffix = f"_l_{language}.yml"
+    entries = {}
+    for root, dirs, files in os.walk(os.path.join(game_dir, "localisation")):
+        dirs.sort()  # 固定遍历顺序，重复键总是由同一个文件覆盖
+        for file in sorted(files):
+            if not file.lower().endswith(suffix):
+                continue
+            with open(os.path.join(root, file), "r", encoding="utf-8-sig", errors="ignore") as f:
+                for key, (_, value) in parse_loc_entries(f.read().splitlines()).items():
+                    entries[key] = value
+    return entries
+
+
+def build_vanilla_index(game_dir, index_path, source_language="english", target_language="simp_chinese"):
+    """从原版游戏目录生成索引文件，返回 (键条目数, 原文条目数)"""
+    source = read_language_entries(game_dir, source_language)
+    target = read_language_entries(game_dir, target_language)
+
+    # 按键排序遍历，保证同一游戏版本每次生成的索引完全一致
+    by_key = {key: (source[key], target[key]) for key in sorted(source.keys() & target.keys())
+              if source[key].strip() and target[key].strip()}
+
+    # 同一原文有多种官方译法时取最常见的一种（票数相同时取键序靠前的）
+    votes = {}
+    for en, zh in by_key.values():
+        votes.setdefault(en, Counter())[zh] += 1
+    by_source = {en: counter.most_common(1)[0][0] for en, counter in votes.items()}
+
+    blob = bytearray()
+
+    def put(*texts):
+        offset = len(blob)
+        for text in texts:
+            data = text.encode("utf-8")
+            blob.extend(LENGTH.pack(len(data)))
+            blob.extend(data)
+        return offset
+
+    key_records = sorted((_hash(key), put(key, en, zh)) for key, (en, zh) in by_key.items())
+    source_records = sorted((_hash(en), put(en, zh)) for en, zh in by_source.items())
+
+    key_table_offset = HEADER.size
+    source_table_offset = key_table_offset + RECORD.size * len(key_records)
+    blob_offset = source_table_offset + RECORD.size * len(source_records)
+
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(INDEX_MAGIC, len(key_records), len(source_records),
+                            key_table_offset, source_table_offset))
+        for h, offset in key_records + source_records:
+            f.write(RECORD.pack(h, blob_offset + offset))
+        f.write(blob)
+    os.replace(tmp_path, index_path)
+    return len(key_records), len(source_records)
+
+
+class VanillaIndex:
+    """只读mmap索引：按键或英文原文查询官方中文译文"""
+
+    def __init__(self, index_path):
+        self._file = open(index_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.key_count, self.source_count, self._key_table, self._source_table = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"不是有效的原版索引文件: {index_path}")
+
+    def close(self):
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _read_texts(self, offset, count):
+        texts = []
+        for _ in range(count):
+            (length,) = LENGTH.unpack_from(self._mm, offset)
+            offset += LENGTH.size
+            texts.append(self._mm[offset:offset + length].decode("utf-8"))
+            offset += length
+        return texts
+
+    def _find(self, table, count, text, fields):
+        """二分查找哈希，再逐条比较原字符串排除碰撞"""
+        target = _hash(text)
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            (h, _) = RECORD.unpack_from(self._mm, table + mid * RECORD.size)
+            if h < target:
+                low = mid + 1
+            else:
+                high = mid
+        while low < count:
+            h, offset = RECORD.unpack_from(self._mm, table + low * RECORD.size)
+            if h != target:
+                break
+            texts = self._read_texts(offset, fields)
+            if texts[0] == text:
+                return texts[1:]
+            low += 1
+        return None
+
+    def lookup_key(self, key):
+        """按键查询，返回 (英文原文, 中文译文) 或 None"""
+        found = self._find(self._key_table, self.key_count, key, 3)
+        return tuple(found) if found else None
+
+    def lookup_source(self, text):
+        """按英文原文查询中文译文"""
+        found = self._find(self._source_table, self.source_count, text, 2)
+        return found[0] if found else None
+
+    def resolve(self, key, text):
+        """优先匹配原文一致的同名键，其次匹配相同原文"""
+        if key:
+            found = self.lookup_key(key)
+            if found and found[0] == text:
+                return found[1]
+        return self.lookup_source(text)
@@ -0,0 +1,92 @@
+"""超长文本分块与拼接测试（不访问网络）"""
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from hoi4_translator import HOI4UltimateTranslator
+
+PARAGRAPH = (
+    "The __PROTECTED_U.S. Army__ moves to __HOI4_VAR_0__. Reserves are mobilised!  "
+    "Supply lines stretch thin. __GLOSSARY_war_support__ drops? The __PROTECTED_U.S. Army__ holds."
+)
+
+
+def long_text():
+    parts = []
+    for i in range(40):
+        parts.append(f"Paragraph {i}. {PARAGRAPH}")
+        parts.append("\\n" * (1 + i % 3))
+    parts.append("A single sentence without any boundary " + "x" * 700)  # 无法再切的超长片段
+    parts.append("\\n\\n")
+    parts.append("The end.")
+    return "".join(parts)
+
+
+class ChunkingTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.translator = HOI4UltimateTranslator(
+            "test-key", use_server_glossary=False, state_dir=self.state_dir, load_cache=False
+        )
+        self.text = long_text()
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def unprotected_boundaries(self, chunk):
+        spans = [m.span() for m in self.translator.placeholder_regex.finditer(chunk)]
+        return [m for m in self.translator.chunk_boundary_regex.finditer(chunk)
+                if not any(a < m.start() < b for a, b in spans)]
+
+    def test_split_round_trips(self):
+        self.assertGreater(len(self.text), 8000)
+        chunks = self.translator._split_long_text(self.text)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunk + sep for chunk, sep in chunks), self.text)
+        self.assertEqual(chunks[-1][1], "")
+
+    def test_never_splits_inside_placeholders(self):
+        chunks = self.translator._split_long_text(self.text)
+        expected = self.translator.placeholder_regex.findall(self.text)
+        found = [p for chunk, _ in chunks for p in self.translator.placeholder_regex.findall(chunk)]
+        self.assertEqual(found, expected)
+        spans = [m.span() for m in self.translator.placeholder_regex.finditer(self.text)]
+        pos = 0
+        for chunk, sep in chunks:
+            pos += len(chunk)
+            self.assertFalse(any(a < pos < b for a, b in spans), pos)
+            pos += len(sep)
+
+    def test_chunks_respect_chunk_size(self):
+        chunks = self.translator._split_long_text(self.text)
+        oversized = [chunk for chunk, _ in chunks if len(chunk) > self.translator.chunk_size]
+        self.assertEqual(len(oversized), 1)
+        for chunk in oversized:
+            # 超长分块只能是无法再切分的单个片段
+            self.assertEqual(self.unprotected_boundaries(chunk), [])
+
+    def test_separators_are_boundaries(self):
+        for _, sep in self.translator._split_long_text(self.text)[:-1]:
+            self.assertRegex(sep, r'^(?:(?:\\n)+|\s+)$')
+
+    def test_translate_long_text_reassembles_in_order(self):
+        self.translator.chunk_batch_size = 3
+        batches = []
+
+        def fake_translate(texts, context=None):
+            batches.append(list(texts))
+            return [text.upper() for text in texts]
+
+        chunks = self.translator._split_long_text(self.text)
+        with mock.patch.object(self.translator, "_deepl_translate", side_effect=fake_translate):
+            result = self.translator._translate_long_text(self.text, "ctx")
+
+        self.assertEqual(result, "".join(chunk.upper() + sep for chunk, sep in chunks))
+        self.assertTrue(all(len(batch) <= 3 for batch in batches))
+        self.assertEqual([text for batch in batches for text in batch],
+                         [chunk for chunk, _ in chunks if chunk.strip()])
+
+
+if __name__ == "__main__":
+    unittest.main()
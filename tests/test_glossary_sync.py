@@ -0,0 +1,170 @@
+"""DeepL服务端术语表同步测试（使用本地模拟服务，不访问网络）"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from hoi4_translator import HOI4UltimateTranslator
+
+
+class MockDeepL(BaseHTTPRequestHandler):
+    """最小化的DeepL v2接口：/glossaries 与 /translate"""
+    glossaries = {}
+    calls = []
+    fail_create = False
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, payload=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        self.calls.append(("GET", path, None))
+        if path.startswith("/v2/glossaries/"):
+            glossary_id = path.rsplit("/", 1)[1]
+            if glossary_id in self.glossaries:
+                return self._send(200, {"glossary_id": glossary_id})
+            return self._send(404, {"message": "Glossary not found"})
+        self._send(404, {"message": "Not found"})
+
+    def do_DELETE(self):
+        path = urlparse(self.path).path
+        self.calls.append(("DELETE", path, None))
+        self.glossaries.pop(path.rsplit("/", 1)[1], None)
+        self._send(204)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        form = self._form()
+        self.calls.append(("POST", path, form))
+        if path == "/v2/glossaries":
+            if self.fail_create:
+                return self._send(500, {"message": "Internal error"})
+            glossary_id = str(uuid.uuid4())
+            entries = dict(line.split("\t") for line in form["entries"][0].split("\n"))
+            self.glossaries[glossary_id] = entries
+            return self._send(201, {"glossary_id": glossary_id, "entry_count": len(entries)})
+        if path == "/v2/translate":
+            return self._send(200, {"translations": [
+                {"detected_source_language": "EN", "text": f"译{text}"} for text in form.get("text", [])
+            ]})
+        self._send(404, {"message": "Not found"})
+
+
+class GlossarySyncTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), MockDeepL)
+        cls.api_base = f"http://127.0.0.1:{cls.server.server_address[1]}/v2"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        MockDeepL.glossaries.clear()
+        MockDeepL.calls.clear()
+        MockDeepL.fail_create = False
+        self.state_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def make_translator(self):
+        return HOI4UltimateTranslator(
+            "test-key", api_base=self.api_base, state_dir=self.state_dir, dashboard_interval=0.01
+        )
+
+    def calls(self, method, path):
+        return [call for call in MockDeepL.calls if call[0] == method and call[1] == path]
+
+    def read_state(self):
+        with open(os.path.join(self.state_dir, "deepl_glossary_state.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_creates_glossary_and_writes_state(self):
+        translator = self.make_translator()
+        glossary_id = translator.sync_glossary()
+
+        self.assertIsNotNone(glossary_id)
+        self.assertIn(glossary_id, MockDeepL.glossaries)
+        self.assertEqual(MockDeepL.glossaries[glossary_id]["war_support"], "战争支持度")
+        state = self.read_state()
+        self.assertEqual(state["glossary_id"], glossary_id)
+        self.assertEqual(state["entry_count"], len(MockDeepL.glossaries[glossary_id]))
+        self.assertEqual(state["hash"], translator._glossary_hash(translator._glossary_entries()))
+
+    def test_reuses_glossary_when_hash_unchanged(self):
+        first_id = self.make_translator().sync_glossary()
+        MockDeepL.calls.clear()
+
+        second_id = self.make_translator().sync_glossary()
+
+        self.assertEqual(second_id, first_id)
+        self.assertEqual(self.calls("POST", "/v2/glossaries"), [])
+        self.assertEqual(self.calls("DELETE", f"/v2/glossaries/{first_id}"), [])
+        self.assertEqual(len(self.calls("GET", f"/v2/glossaries/{first_id}")), 1)
+
+    def test_replaces_glossary_when_hash_changes(self):
+        old_id = self.make_translator().sync_glossary()
+        old_hash = self.read_state()["hash"]
+        with open(os.path.join(self.state_dir, "translation_glossary.json"), "w", encoding="utf-8") as f:
+            json.dump({"Home Guard": "国民自卫队"}, f, ensure_ascii=False)
+        MockDeepL.calls.clear()
+
+        new_id = self.make_translator().sync_glossary()
+
+        self.assertNotEqual(new_id, old_id)
+        self.assertEqual(len(self.calls("DELETE", f"/v2/glossaries/{old_id}")), 1)
+        self.assertNotIn(old_id, MockDeepL.glossaries)
+        self.assertEqual(MockDeepL.glossaries[new_id]["Home Guard"], "国民自卫队")
+        state = self.read_state()
+        self.assertEqual(state["glossary_id"], new_id)
+        self.assertNotEqual(state["hash"], old_hash)
+
+    def test_falls_back_to_local_substitution_on_failure(self):
+        MockDeepL.fail_create = True
+        translator = self.make_translator()
+
+        self.assertIsNone(translator.sync_glossary())
+        self.assertIsNone(translator.glossary_id)
+        self.assertFalse(os.path.exists(os.path.join(self.state_dir, "deepl_glossary_state.json")))
+        translated = translator._translate_text(' test_entry:0 "Gain army_experience now"')
+        self.assertEqual(translated, ' test_entry:0 "译Gain 陆军经验 now"')
+        requests_sent = self.calls("POST", "/v2/translate")
+        self.assertEqual(len(requests_sent), 1)
+        self.assertNotIn("glossary_id", requests_sent[0][2])
+        self.assertNotEqual(requests_sent[0][2]["text"][0], "Gain army_experience now")
+
+    def test_translate_requests_carry_glossary_id(self):
+        translator = self.make_translator()
+        glossary_id = translator.sync_glossary()
+
+        self.assertEqual(translator._deepl_translate(["Hello there"]), ["译Hello there"])
+        requests_sent = self.calls("POST", "/v2/translate")
+        self.assertEqual(len(requests_sent), 1)
+        self.assertEqual(requests_sent[0][2]["glossary_id"], [glossary_id])
+        protected, _ = translator._replace_special_content("Gain army_experience now")
+        self.assertEqual(protected, "Gain army_experience now")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+"""本地化输出校验测试（纯函数与目录校验）"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from hoi4_translator import HOI4UltimateTranslator
+from hoi4_translator.validator import check_loc_value, validate_directories, validate_loc_file
+
+BOM = "﻿"
+
+
+def codes(issues):
+    return sorted(issue[0] if isinstance(issue, tuple) else issue["code"] for issue in issues)
+
+
+class CheckLocValueTest(unittest.TestCase):
+    def test_clean_value(self):
+        self.assertEqual(check_loc_value("§Y$COUNT$§! [Root.GetName] £pol_power",
+                                         "§Y$COUNT$§! [Root.GetName] £pol_power"), [])
+
+    def test_unbalanced_quotes(self):
+        self.assertEqual(codes(check_loc_value('他说"你好')), ["unbalanced_quotes"])
+        self.assertEqual(check_loc_value('他说\\"你好\\"'), [])
+
+    def test_unbalanced_color(self):
+        self.assertEqual(codes(check_loc_value("§R警告")), ["unbalanced_color"])
+        self.assertEqual(codes(check_loc_value("警告§!")), ["unbalanced_color"])
+        self.assertEqual(check_loc_value("§R警告§!"), [])
+
+    def test_mismatch_codes(self):
+        cases = {
+            "vars_mismatch": ("Gain $VALUE$ now", "立即获得"),
+            "scripted_loc_mismatch": ("[ROOT.GetName] wins", "获胜"),
+            "icons_mismatch": ("Costs £pol_power", "消耗"),
+            "colors_mismatch": ("§Ywarning§!", "§R警告§!"),
+        }
+        for code, (source, target) in cases.items():
+            with self.subTest(code=code):
+                self.assertEqual(codes(check_loc_value(target, source)), [code])
+
+    def test_mismatch_reports_missing_and_extra(self):
+        (code, message), = check_loc_value("获得 $OTHER$", "Gain $VALUE$")
+        self.assertEqual(code, "vars_mismatch")
+        self.assertIn("$VALUE$", message)
+        self.assertIn("$OTHER$", message)
+
+
+class ValidateLocFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, name, text, bom=True):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write((BOM if bom else "") + text)
+        return path
+
+    def test_valid_file(self):
+        path = self.write("test_l_english.yml", 'l_english:\n # 注释\n key_a:0 "你好"\n key_b: "世界"\n')
+        self.assertEqual(validate_loc_file(path), [])
+
+    def test_missing_bom(self):
+        path = self.write("test_l_english.yml", 'l_english:\n key_a:0 "你好"\n', bom=False)
+        self.assertEqual(codes(validate_loc_file(path)), ["missing_bom"])
+
+    def test_missing_header(self):
+        path = self.write("test_l_english.yml", ' key_a:0 "你好"\n')
+        issues = validate_loc_file(path)
+        self.assertEqual(codes(issues), ["missing_header"])
+        self.assertEqual(issues[0]["line"], 1)
+
+    def test_header_language_must_match_file_name(self):
+        path = self.write("test_l_english.yml", 'l_simp_chinese:\n key_a:0 "你好"\n')
+        self.assertEqual(codes(validate_loc_file(path)), ["header_mismatch"])
+
+    def test_syntax_error(self):
+        path = self.write("test_l_english.yml", 'l_english:\n key_a:0 "你好"\n key_b 缺少引号\n')
+        issues = validate_loc_file(path)
+        self.assertEqual(codes(issues), ["syntax"])
+        self.assertEqual(issues[0]["line"], 3)
+
+    def test_value_issues_carry_key_and_line(self):
+        path = self.write("test_l_english.yml", 'l_english:\n key_a:0 "§R警告"\n')
+        issue, = validate_loc_file(path)
+        self.assertEqual((issue["code"], issue["key"], issue["line"]), ("unbalanced_color", "key_a", 2))
+
+    def test_compares_tokens_against_backup(self):
+        source = self.write("test_l_english.yml.backup", "l_english:\n"
+                            ' key_var:0 "Gain $VALUE$"\n'
+                            ' key_loc:0 "[ROOT.GetName] wins"\n'
+                            ' key_icon:0 "Costs £pol_power"\n'
+                            ' key_color:0 "§Ywarning§!"\n'
+                            ' key_ok:0 "Fine"\n'
+                            ' key_gone:0 "Removed"\n')
+        path = self.write("test_l_english.yml", "l_english:\n"
+                          ' key_var:0 "获得"\n'
+                          ' key_loc:0 "获胜"\n'
+                          ' key_icon:0 "消耗"\n'
+                          ' key_color:0 "§R警告§!"\n'
+                          ' key_ok:0 "没问题"\n')
+        found = {(issue["key"], issue["code"]) for issue in validate_loc_file(path, source)}
+        self.assertEqual(found, {
+            ("key_var", "vars_mismatch"),
+            ("key_loc", "scripted_loc_mismatch"),
+            ("key_icon", "icons_mismatch"),
+            ("key_color", "colors_mismatch"),
+            ("key_gone", "missing_key"),
+        })
+
+
+class ValidateDirectoriesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.mods = []
+        for name in ("mod_a", "mod_b"):
+            directory = os.path.join(self.tmp, name)
+            os.makedirs(directory)
+            path = os.path.join(directory, f"{name}_l_english.yml")
+            with open(f"{path}.backup", "w", encoding="utf-8") as f:
+                f.write(BOM + f'l_english:\n {name}_ok:0 "Fine"\n {name}_bad:0 "Gain $VALUE$"\n')
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(BOM + f'l_english:\n {name}_ok:0 "没问题"\n {name}_bad:0 "获得"\n')
+            self.mods.append((directory, path))
+        self.output_dir = os.path.join(self.tmp, "reports")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_failed_keys_shape(self):
+        issues, failed_keys = validate_directories(
+            [directory for directory, _ in self.mods], max_workers=2, output_dir=self.output_dir
+        )
+        self.assertEqual(len(issues), 2)
+        expected = {path: [f"{os.path.basename(os.path.dirname(path))}_bad"] for _, path in self.mods}
+        self.assertEqual(failed_keys, expected)
+        self.assertTrue(all(os.path.isabs(path) for path in failed_keys))
+        with open(os.path.join(self.output_dir, "failed_keys.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f), expected)
+        with open(os.path.join(self.output_dir, "validation_issues.json"), encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_retranslate_consumes_failed_keys(self):
+        validate_directories([directory for directory, _ in self.mods], max_workers=2,
+                             output_dir=self.output_dir)
+        translator = HOI4UltimateTranslator("test-key", use_server_glossary=False,
+                                            state_dir=os.path.join(self.tmp, "state"))
+        with mock.patch.object(translator, "check_usage", return_value=None), \
+                mock.patch.object(translator, "_deepl_translate",
+                                  side_effect=lambda texts, context=None: [f"译{t}" for t in texts]) as deepl:
+            retranslated = translator.retranslate_failed_keys(os.path.join(self.output_dir, "failed_keys.json"))
+
+        self.assertEqual(retranslated, 2)
+        self.assertTrue(deepl.called)
+        for directory, path in self.mods:
+            name = os.path.basename(directory)
+            with open(path, encoding="utf-8-sig") as f:
+                content = f.read()
+            self.assertIn(f'{name}_bad:0 "译Gain $VALUE$"', content)
+            self.assertIn(f'{name}_ok:0 "没问题"', content)
+            self.assertEqual(validate_loc_file(path, f"{path}.backup"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""原版本地化索引测试（在临时目录中构造最小的原版游戏目录）"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from hoi4_translator import vanilla
+from hoi4_translator.vanilla import VanillaIndex, build_vanilla_index
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENGLISH = {
+    "ideas_stab": "Stability",
+    "focus_war_economy": "War Economy",
+    "same_a": "Same",
+    "same_b": "Same",
+    "same_c": "Same",
+    "tie_x": "Tie",
+    "tie_y": "Tie",
+    "only_english": "No translation",
+}
+CHINESE = {
+    "ideas_stab": "稳定度",
+    "focus_war_economy": "战时经济",
+    "same_a": "相同甲",
+    "same_b": "相同乙",
+    "same_c": "相同乙",
+    "tie_y": "平局乙",
+    "tie_x": "平局甲",
+    "only_chinese": "没有原文",
+}
+
+
+def write_loc(path, language, entries):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8-sig") as f:
+        f.write(f"l_{language}:\n")
+        for key, value in entries.items():
+            f.write(f' {key}:0 "{value}"\n')
+
+
+class VanillaIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.game_dir = os.path.join(self.tmp, "game")
+        loc = os.path.join(self.game_dir, "localisation")
+        write_loc(os.path.join(loc, "english", "test_l_english.yml"), "english", ENGLISH)
+        write_loc(os.path.join(loc, "simp_chinese", "test_l_simp_chinese.yml"), "simp_chinese", CHINESE)
+        self.index_path = os.path.join(self.tmp, "vanilla_index.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def build(self, index_path=None):
+        return build_vanilla_index(self.game_dir, index_path or self.index_path)
+
+    def test_build_counts_only_keys_present_in_both_languages(self):
+        key_count, source_count = self.build()
+        self.assertEqual(key_count, 7)
+        self.assertEqual(source_count, 4)  # Stability, War Economy, Same, Tie
+        self.assertFalse(os.path.exists(f"{self.index_path}.tmp"))
+
+    def test_lookup_key(self):
+        self.build()
+        with VanillaIndex(self.index_path) as index:
+            self.assertEqual(index.lookup_key("ideas_stab"), ("Stability", "稳定度"))
+            self.assertEqual(index.lookup_key("same_a"), ("Same", "相同甲"))
+            self.assertIsNone(index.lookup_key("only_english"))
+            self.assertIsNone(index.lookup_key("missing_key"))
+
+    def test_lookup_source_prefers_most_common_translation(self):
+        self.build()
+        with VanillaIndex(self.index_path) as index:
+            self.assertEqual(index.lookup_source("War Economy"), "战时经济")
+            self.assertEqual(index.lookup_source("Same"), "相同乙")
+            # 票数相同时取键序靠前的译法
+            self.assertEqual(index.lookup_source("Tie"), "平局甲")
+            self.assertIsNone(index.lookup_source("Unknown text"))
+
+    def test_resolve_prefers_key_when_source_matches(self):
+        self.build()
+        with VanillaIndex(self.index_path) as index:
+            self.assertEqual(index.resolve("same_a", "Same"), "相同甲")
+            # 键存在但原文不同：退回按原文查询
+            self.assertEqual(index.resolve("same_a", "War Economy"), "战时经济")
+            self.assertIsNone(index.resolve("same_a", "Changed by the mod"))
+            # mod自己的键：按原文查询
+            self.assertEqual(index.resolve("mymod_focus", "Same"), "相同乙")
+            self.assertEqual(index.resolve(None, "Stability"), "稳定度")
+
+    def test_hash_collisions_fall_back_to_string_comparison(self):
+        with mock.patch.object(vanilla, "_hash", lambda text: 42):
+            self.build()
+            with VanillaIndex(self.index_path) as index:
+                self.assertEqual(index.lookup_key("focus_war_economy"), ("War Economy", "战时经济"))
+                self.assertEqual(index.lookup_key("tie_y"), ("Tie", "平局乙"))
+                self.assertEqual(index.lookup_source("Stability"), "稳定度")
+                self.assertIsNone(index.lookup_key("missing_key"))
+
+    def test_rebuild_is_byte_identical_across_hash_seeds(self):
+        outputs = []
+        for seed in ("1", "2", "3"):
+            index_path = os.path.join(self.tmp, f"index_{seed}.bin")
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+            subprocess.run(
+                [sys.executable, "-c",
+                 "import sys; from hoi4_translator.vanilla import build_vanilla_index; "
+                 "build_vanilla_index(sys.argv[1], sys.argv[2])",
+                 self.game_dir, index_path],
+                check=True, env=env
+            )
+            with open(index_path, "rb") as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+    def test_rejects_files_without_magic(self):
+        with open(self.index_path, "wb") as f:
+            f.write(b"NOTANIDX" + b"\0" * 32)
+        with self.assertRaises(ValueError):
+            VanillaIndex(self.index_path)
+
+    def test_close_releases_mmap(self):
+        self.build()
+        index = VanillaIndex(self.index_path)
+        with index:
+            self.assertIsNotNone(index.lookup_key("ideas_stab"))
+        self.assertIsNone(index._mm)
+        self.assertTrue(index._file.closed)
+        index.close()  # 重复关闭不报错
+
+
+if __name__ == "__main__":
+    unittest.main()